@@ -2,7 +2,19 @@ import os
 import re
 import sys
 import json
-import urllib.request
+
+# Matches 'ID: ' followed by 10+ chars (used with .match, so anchored at the start)
+# Ensures ID starts with 1-9 (e.g., ENG-1, not ENG-0 or ENG-01)
+_TICKET_RE = re.compile(r'([A-Z]+-[1-9][0-9]*):\s(.{10,})')
+# Shortest text the regex can match: 'A-1: ' plus 10 chars of description
+_MIN_TICKET_LEN = 15
+_FORMAT_HELP = (
+    '**Expected:** "ENG-123: Detailed description here..."\n\n'
+    '(Must start with ID [no leading zeros], have a colon, and at least 10 chars of description)'
+)
+
+# Merge and revert messages are generated by git/GitHub and never carry a ticket
+_SKIP_PREFIXES = ('Merge pull request', 'Merge branch', 'Revert ')
 
 def fail_with_comment(message):
     """
@@ -19,6 +31,9 @@ def fail_with_comment(message):
 
     # Only attempt to comment if we are in a PR context and have credentials
     if event == 'pull_request' and repo and pr_num and token:
+        # Imported here so early exits don't pay for loading urllib
+        import urllib.request
+
         print('Posting comment to GitHub PR...')
         url = f'https://api.github.com/repos/{repo}/issues/{pr_num}/comments'
         body_text = f'❌ **Linear Ticket Check Failed**\n\n{message}'
@@ -54,11 +69,6 @@ def main():
         text_to_check = os.environ.get('COMMIT_MSG', '')
         check_source = 'Commit Message'
 
-        # --- Ignore Merge Commits ---
-        if text_to_check.startswith('Merge pull request') or text_to_check.startswith('Merge branch'):
-            print(f"Skipping validation for Merge Commit: {text_to_check}")
-            sys.exit(0)
-
     elif event_name == 'pull_request':
         pr_body = os.environ.get('PR_BODY', '')
         pr_title = os.environ.get('PR_TITLE', '')
@@ -83,14 +93,19 @@ def main():
             text_to_check = lines[0]
             check_source = 'First line of PR Description'
 
+    # --- Ignore Merge / Revert Commits (before paying for the regex) ---
+    if text_to_check.startswith(_SKIP_PREFIXES):
+        print(f"Skipping validation for Merge/Revert {check_source}: {text_to_check}")
+        sys.exit(0)
+
     # 2. Parse Ticket ID
-    # Matches 'ID: ' followed by 10+ chars
-    # UPDATED REGEX: Ensures ID starts with 1-9 (e.g., ENG-1, not ENG-0 or ENG-01)
-    pattern = r'^([A-Z]+-[1-9][0-9]*):\s(.{10,})'
-    match = re.search(pattern, text_to_check)
+    # Cheap pre-checks: too short, or no hyphen/colon, and the regex can never match
+    match = None
+    if len(text_to_check) >= _MIN_TICKET_LEN and '-' in text_to_check and ':' in text_to_check:
+        match = _TICKET_RE.match(text_to_check)
 
     if not match:
-        fail_with_comment(f'The format in the **{check_source}** is invalid.\n\n**Found:** \"{text_to_check}\"\n**Expected:** \"ENG-123: Detailed description here...\"\n\n(Must start with ID [no leading zeros], have a colon, and at least 10 chars of description)')
+        fail_with_comment(f'The format in the **{check_source}** is invalid.\n\n**Found:** \"{text_to_check}\"\n{_FORMAT_HELP}')
 
     ticket_id = match.group(1)
     print(f'Found Ticket ID: {ticket_id}')
@@ -99,6 +114,8 @@ def main():
     if not linear_api_key:
         fail_with_comment('LINEAR_API_KEY input is missing.')
 
+    import urllib.request
+
     query = f'query {{ issue(id: "{ticket_id}") {{ id title }} }}'
     data = json.dumps({'query': query}).encode('utf-8')
     req = urllib.request.Request(
@@ -2,13 +2,236 @@ import os
 import re
 import sys
 import json
+import time
+import tempfile
 import subprocess
-import urllib.request
-import urllib.error
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-def run_command(command):
-    return subprocess.check_output(command, shell=True).decode('utf-8').strip()
+# orjson is optional; it parses the event payload faster when the runner has it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Regex ensures number starts with 1-9 (avoids PA-0)
+_ID_RE = re.compile(r'([A-Z]+-[1-9][0-9]*)')
+_SCAN_BATCH_SIZE = 1000
+
+# Release "id" field, and the start of the first nested object/array value.
+# Any "id" before that nested value must belong to the top-level release object.
+_RELEASE_ID_RE = re.compile(rb'"id"\s*:\s*(\d+)')
+_NESTED_VALUE_RE = re.compile(rb':\s*[\[{]')
+
+# Optional on-disk cache of Linear ticket titles, reused across releases.
+# Enabled by setting LINEAR_CACHE to a path.
+_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+_CACHE_MAX_ENTRIES = 10000
+
+# Keep-alive HTTPS connections, one per host, reused across API calls
+_connections = {}
+
+def run_command(argv):
+    return subprocess.check_output(argv, stderr=subprocess.DEVNULL).decode('utf-8').strip()
+
+def open_connection(netloc):
+    """
+    Opens an HTTPS connection to netloc, tunnelling through the https_proxy
+    from the environment (honouring no_proxy) like urllib.request does.
+    """
+    import base64
+    import http.client
+    import urllib.parse
+    import urllib.request
+
+    proxy = urllib.request.getproxies().get('https')
+    if not proxy or urllib.request.proxy_bypass(netloc.rsplit(':', 1)[0]):
+        return http.client.HTTPSConnection(netloc)
+
+    if '://' not in proxy:
+        proxy = f"http://{proxy}"
+    proxy_parts = urllib.parse.urlsplit(proxy)
+    tunnel_headers = {}
+    if proxy_parts.username:
+        credentials = f"{urllib.parse.unquote(proxy_parts.username)}:{urllib.parse.unquote(proxy_parts.password or '')}"
+        tunnel_headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials.encode()).decode()
+
+    conn = http.client.HTTPSConnection(proxy_parts.hostname, proxy_parts.port)
+    conn.set_tunnel(netloc, headers=tunnel_headers)
+    return conn
+
+def http_request(method, url, data=None, headers=None):
+    """
+    Sends a request over a reused keep-alive connection for the URL's host.
+    Returns the response body as bytes and raises HTTPError for any non-2xx
+    status. Redirects are not followed, so they surface as errors too.
+    """
+    # Imported here so runs that exit before any network call don't load them
+    import http.client
+    import urllib.error
+    import urllib.parse
+
+    parts = urllib.parse.urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    # GitHub rejects requests without a User-Agent (urllib used to add one)
+    request_headers = {'User-Agent': 'release-notes-generator'}
+    request_headers.update(headers or {})
+
+    for attempt in range(2):
+        conn = _connections.get(parts.netloc)
+        if conn is None:
+            conn = _connections[parts.netloc] = open_connection(parts.netloc)
+        try:
+            conn.request(method, path, body=data, headers=request_headers)
+            response = conn.getresponse()
+            body = response.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # The server dropped the idle keep-alive socket; retry once on a new one
+            conn.close()
+            _connections.pop(parts.netloc, None)
+            if attempt:
+                raise
+
+    if not 200 <= response.status < 300:
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+    return body
+
+def close_connections():
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+
+def load_linear_cache(cache_file):
+    """
+    Returns the cached {identifier: {title, url, ts, used}} entries, or {} if
+    the cache is missing or unreadable. Entries not in that shape are dropped.
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            cache = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict):
+        return {}
+    return {
+        tid: entry for tid, entry in cache.items()
+        if isinstance(entry, dict)
+        and isinstance(entry.get('title'), str)
+        and isinstance(entry.get('url'), str)
+        and isinstance(entry.get('ts'), (int, float))
+        and isinstance(entry.get('used', 0), (int, float))
+    }
+
+def save_linear_cache(cache_file, cache):
+    """
+    Keeps the most recently used entries and writes them atomically.
+    """
+    newest = sorted(cache.items(), key=lambda item: item[1].get('used', 0), reverse=True)
+    cache_dir = os.path.dirname(cache_file) or '.'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # A unique temp file, so concurrent jobs never write into the same one
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(dict(newest[:_CACHE_MAX_ENTRIES]), f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            os.unlink(tmp_file)
+            raise
+    except OSError as e:
+        print(f"Warning: Could not write Linear cache: {e}")
+
+def fetch_linear_titles(linear_ids, linear_api_key):
+    """
+    Looks up the given ticket IDs, using the on-disk cache (if LINEAR_CACHE is
+    set) for recently fetched tickets and querying Linear only for the rest.
+    Returns the summary lines for the release notes, plus the IDs that could not
+    be looked up because the Linear request failed.
+    """
+    cache_file = os.environ.get('LINEAR_CACHE')
+    if cache_file:
+        cache_file = os.path.expanduser(cache_file)
+    cache = load_linear_cache(cache_file) if cache_file else {}
+    now = time.time()
+
+    # Entries older than the TTL are refetched so renamed tickets get picked up
+    issues = {}
+    for tid in linear_ids:
+        entry = cache.get(tid)
+        if entry and now - entry.get('ts', 0) < _CACHE_TTL_SECONDS:
+            issues[tid] = entry
+    missing = linear_ids - issues.keys()
+    if issues:
+        print(f"Using cached titles for {len(issues)} tickets.")
+
+    unfetched_ids = set()
+    if missing:
+        # CHANGED: Request 'identifier' (CPT-123) instead of 'id' (UUID)
+        # IDs are passed as a GraphQL variable so they are JSON-escaped, not interpolated
+        query = """
+        query($ids: [ID!]) {
+          issues(filter: { id: { in: $ids } }) {
+            nodes {
+              identifier
+              title
+              url
+            }
+          }
+        }
+        """
+        payload = {'query': query, 'variables': {'ids': sorted(missing)}}
+        unfetched_ids = set(missing)
+        
+        try:
+            response = http_request(
+                'POST',
+                'https://api.linear.app/graphql',
+                data=json.dumps(payload).encode('utf-8'),
+                headers={'Content-Type': 'application/json', 'Authorization': linear_api_key}
+            )
+            resp_json = json.loads(response.decode())
+            
+            data_obj = resp_json.get('data')
+            
+            if not data_obj:
+                print(f"❌ Linear API returned errors: {json.dumps(resp_json.get('errors', 'Unknown Error'))}")
+            else:
+                unfetched_ids = set()
+                nodes = data_obj.get('issues', {}).get('nodes', [])
+                for issue in nodes:
+                    # CHANGED: Use issue['identifier'] here
+                    issues[issue['identifier']] = {'title': issue['title'], 'url': issue['url'], 'ts': now}
+                        
+        except Exception as e:
+            print(f"Warning: Failed to fetch Linear data: {e}")
+
+    if cache_file and issues:
+        for tid, entry in issues.items():
+            entry['used'] = now
+            cache[tid] = entry
+        save_linear_cache(cache_file, cache)
+
+    summary_lines = [
+        f"* **{tid}**: {issues[tid]['title']} ([View]({issues[tid]['url']}))"
+        for tid in sorted(issues)
+    ]
+    return summary_lines, unfetched_ids
+
+def fetch_release_id(api_base, tag, headers):
+    """
+    Returns the id of the GitHub Release object for the given tag.
+    """
+    response = http_request("GET", f"{api_base}/releases/tags/{tag}", headers=headers)
+    # Only the id is needed, so avoid decoding the whole (multi-KB) release body.
+    # GitHub currently puts "id" before "author"/"assets"; if that ever changes,
+    # the scan finds nothing and we fall back to a full parse.
+    nested = _NESTED_VALUE_RE.search(response)
+    match = _RELEASE_ID_RE.search(response, 0, nested.start() if nested else len(response))
+    if match:
+        return int(match.group(1))
+    return json.loads(response.decode())['id']
 
 def main():
     # --- Configuration ---
@@ -25,8 +248,8 @@ def main():
 
     # 1. Identify the Commit Range
     try:
-        prev_tag = run_command(f"git describe --tags --abbrev=0 {current_tag}^ 2>/dev/null || echo ''")
-    except:
+        prev_tag = run_command(["git", "describe", "--tags", "--abbrev=0", f"{current_tag}^"])
+    except (subprocess.CalledProcessError, OSError):
         prev_tag = ""
 
     if prev_tag:
@@ -37,85 +260,72 @@ def main():
         log_range = current_tag
 
     # 2. Get Commit Messages
+    # Streamed line by line so the raw log is never held in memory as a whole
+    change_log_lines = []
+    linear_ids = set()
+    # Subjects are scanned for Linear IDs in batches: one regex call per batch
+    # rather than per commit, without keeping every subject around
+    subjects = []
+
     try:
-        git_log = run_command(f'git log {log_range} --pretty=format:"%h|%an|%s"')
-        commits = git_log.splitlines()
+        with subprocess.Popen(
+            ["git", "log", log_range, "--pretty=format:%h|%an|%s"],
+            stdout=subprocess.PIPE,
+            encoding="utf-8"
+        ) as git_log:
+            # 3. Extract Linear IDs and Build Change Log
+            for line in git_log.stdout:
+                hash_id, sep, rest = line.rstrip("\n").partition("|")
+                if not sep: continue
+                author, sep, subject = rest.partition("|")
+                if not sep: continue
+                
+                change_log_lines.append(f"* {subject} ({hash_id}) - @{author}")
+                subjects.append(subject)
+                if len(subjects) >= _SCAN_BATCH_SIZE:
+                    linear_ids.update(_ID_RE.findall("\n".join(subjects)))
+                    subjects.clear()
+
+        if git_log.returncode != 0:
+            raise subprocess.CalledProcessError(git_log.returncode, git_log.args)
     except Exception as e:
         print(f"Error fetching git log: {e}")
         sys.exit(1)
 
-    # 3. Extract Linear IDs and Build Change Log
-    linear_ids = set()
-    change_log_lines = []
-    
-    # Regex ensures number starts with 1-9 (avoids PA-0)
-    id_pattern = r'([A-Z]+-[1-9][0-9]*)'
+    # Only subjects are scanned so author names never contribute IDs
+    linear_ids.update(_ID_RE.findall("\n".join(subjects)))
 
-    for line in commits:
-        if "|" not in line: continue
-        parts = line.split("|", 2)
-        if len(parts) < 3: continue
-        
-        hash_id, author, subject = parts
-        change_log_lines.append(f"* {subject} ({hash_id}) - @{author}")
-        
-        found = re.findall(id_pattern, subject)
-        for ticket in found:
-            linear_ids.add(ticket)
+    # 4. Fetch Linear Titles and look up the GitHub Release concurrently
+    # Both are independent network calls, so overlap them instead of paying
+    # for each round trip in sequence.
+    api_base = f"https://api.github.com/repos/{repo_name}"
+    headers = {
+        "Authorization": f"Bearer {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json"
+    }
 
-    # 4. Fetch Linear Titles
-    summary_lines = []
+    executor = ThreadPoolExecutor(max_workers=2)
+    fut_linear = None
     if linear_ids and linear_api_key:
         print(f"Fetching titles for {len(linear_ids)} tickets...")
-        ids_string = '", "'.join(linear_ids)
-        
-        # CHANGED: Request 'identifier' (CPT-123) instead of 'id' (UUID)
-        query = f"""
-        query {{
-          issues(filter: {{ id: {{ in: ["{ids_string}"] }} }}) {{
-            nodes {{
-              identifier
-              title
-              url
-            }}
-          }}
-        }}
-        """
-        
-        req = urllib.request.Request(
-            'https://api.linear.app/graphql',
-            data=json.dumps({'query': query}).encode('utf-8'),
-            headers={'Content-Type': 'application/json', 'Authorization': linear_api_key}
-        )
-
-        try:
-            with urllib.request.urlopen(req) as response:
-                resp_json = json.loads(response.read().decode())
-                
-                data_obj = resp_json.get('data')
-                
-                if not data_obj:
-                    print(f"❌ Linear API returned errors: {json.dumps(resp_json.get('errors', 'Unknown Error'))}")
-                    summary_lines = []
-                else:
-                    nodes = data_obj.get('issues', {}).get('nodes', [])
-                    for issue in nodes:
-                        # CHANGED: Use issue['identifier'] here
-                        summary_lines.append(f"* **{issue['identifier']}**: {issue['title']} ([View]({issue['url']}))")
-                        
-        except Exception as e:
-            print(f"Warning: Failed to fetch Linear data: {e}")
+        fut_linear = executor.submit(fetch_linear_titles, linear_ids, linear_api_key)
+    fut_release = None
+    if not is_dry_run:
+        fut_release = executor.submit(fetch_release_id, api_base, current_tag, headers)
+    executor.shutdown(wait=False)
 
     # 5. Build Release Info Section
     release_branch = "Unknown"
     release_author = os.environ.get('GITHUB_ACTOR', 'Unknown')
-    release_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    release_time = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
     
     event_path = os.environ.get('GITHUB_EVENT_PATH')
     if event_path and os.path.exists(event_path):
         try:
-            with open(event_path, 'r') as f:
-                event_data = json.load(f)
+            with open(event_path, 'rb') as f:
+                raw_event = f.read()
+            event_data = orjson.loads(raw_event) if orjson else json.loads(raw_event)
             
             if 'release' in event_data:
                 release_branch = event_data['release'].get('target_commitish', release_branch)
@@ -131,33 +341,48 @@ def main():
             print(f"Warning: Could not parse event payload: {e}")
 
     # 6. Assemble Markdown
-    markdown_body = "## 🚀 Release Info\n"
-    markdown_body += f"* **Branch:** {release_branch}\n"
-    markdown_body += f"* **Time:** {release_time}\n"
-    markdown_body += f"* **Created By:** {release_author}\n\n"
+    summary_lines, unfetched_ids = fut_linear.result() if fut_linear else ([], set())
+    if not summary_lines:
+        # Nothing was resolved (no API key, or the lookup failed): list every ID
+        unfetched_ids = linear_ids
 
-    markdown_body += "## 📝 Summary (Linear Tickets)\n"
+    parts = [
+        "## 🚀 Release Info\n",
+        f"* **Branch:** {release_branch}\n",
+        f"* **Time:** {release_time}\n",
+        f"* **Created By:** {release_author}\n\n",
+        "## 📝 Summary (Linear Tickets)\n",
+    ]
     if summary_lines:
-        markdown_body += "\n".join(summary_lines)
-    elif linear_ids:
-        markdown_body += "⚠️ **Warning:** Could not fetch ticket titles (Check API Key or Logs).\n\n"
-        markdown_body += "**Referenced Tickets:**\n"
-        for tid in sorted(linear_ids):
-            markdown_body += f"* {tid}\n"
-    else:
-        markdown_body += "No Linear tickets referenced."
+        parts.append("\n".join(summary_lines))
+    if unfetched_ids:
+        if summary_lines:
+            parts.append("\n\n")
+        parts.append("⚠️ **Warning:** Could not fetch ticket titles (Check API Key or Logs).\n\n")
+        parts.append("**Referenced Tickets:**\n")
+        parts.extend(f"* {tid}\n" for tid in sorted(unfetched_ids))
+    elif not summary_lines:
+        parts.append("No Linear tickets referenced.")
 
-    markdown_body += "\n\n## 🛠 Change Log\n"
+    parts.append("\n\n## 🛠 Change Log\n")
     if change_log_lines:
-        markdown_body += "\n".join(change_log_lines)
+        parts.append("\n".join(change_log_lines))
     else:
-        markdown_body += "No commits found in this range."
+        parts.append("No commits found in this range.")
+
+    markdown_body = "".join(parts)
 
     # 7. Generate Local File
     output_filename = "release_notes.md"
     try:
-        with open(output_filename, "w", encoding="utf-8") as f:
-            f.write(markdown_body)
+        # Encode once and write the raw bytes, bypassing the text I/O layer
+        data = memoryview(markdown_body.encode("utf-8"))
+        fd = os.open(output_filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
         print(f"✅ Generated local file: {output_filename}")
     except Exception as e:
         print(f"Error writing local file: {e}")
@@ -174,30 +399,17 @@ def main():
 
     # --- LIVE UPDATE LOGIC ---
     print("Updating GitHub Release...")
-    api_base = f"https://api.github.com/repos/{repo_name}"
-    headers = {
-        "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-        "Content-Type": "application/json"
-    }
+    from urllib.error import HTTPError
 
     try:
-        req = urllib.request.Request(f"{api_base}/releases/tags/{current_tag}", headers=headers)
-        with urllib.request.urlopen(req) as response:
-            release_data = json.loads(response.read().decode())
-            release_id = release_data['id']
-            
+        # The lookup and the PATCH go to api.github.com and share one TLS connection
+        release_id = fut_release.result()
+
         update_data = json.dumps({"body": markdown_body}).encode("utf-8")
-        req_update = urllib.request.Request(
-            f"{api_base}/releases/{release_id}", 
-            data=update_data, 
-            headers=headers, 
-            method="PATCH"
-        )
-        with urllib.request.urlopen(req_update) as response:
-            print(f"Successfully updated Release {current_tag}!")
-
-    except urllib.error.HTTPError as e:
+        http_request("PATCH", f"{api_base}/releases/{release_id}", data=update_data, headers=headers)
+        print(f"Successfully updated Release {current_tag}!")
+
+    except HTTPError as e:
         print(f"Error updating GitHub release (Tag might not have a release object yet): {e}")
         sys.exit(1)
     except Exception as e:
@@ -205,4 +417,7 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_connections()